@@ -1,7 +1,204 @@
 import io
+import os
 import socket
 import sys
-import datetime
+import asyncio
+import email.utils
+import functools
+import selectors
+import signal
+import struct
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+_HTTP11_PREFIX = b'HTTP/1.1 '
+_SERVER_HEADER = b'Server: WSGIServer 0.2\r\n'
+_CRLF = b'\r\n'
+_KEEP_ALIVE_HEADER = b'Connection: keep-alive\r\n'
+_CLOSE_HEADER = b'Connection: close\r\n'
+# The parts of every response that never change, encoded to bytes once when
+# the module is imported instead of being formatted again for each request.
+
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+_IOV_MAX = 1024
+# sendmsg() is not available on Windows. Where it is, the kernel limits how
+# many separate buffers one call may be given (IOV_MAX, 1024 on Linux).
+
+_KNOWN_HEADERS = {
+    b'content-length': 'CONTENT_LENGTH',
+    b'content-type': 'CONTENT_TYPE',
+    b'accept': 'HTTP_ACCEPT',
+    b'accept-charset': 'HTTP_ACCEPT_CHARSET',
+    b'accept-encoding': 'HTTP_ACCEPT_ENCODING',
+    b'accept-language': 'HTTP_ACCEPT_LANGUAGE',
+    b'access-control-request-headers': 'HTTP_ACCESS_CONTROL_REQUEST_HEADERS',
+    b'access-control-request-method': 'HTTP_ACCESS_CONTROL_REQUEST_METHOD',
+    b'authorization': 'HTTP_AUTHORIZATION',
+    b'cache-control': 'HTTP_CACHE_CONTROL',
+    b'connection': 'HTTP_CONNECTION',
+    b'cookie': 'HTTP_COOKIE',
+    b'dnt': 'HTTP_DNT',
+    b'expect': 'HTTP_EXPECT',
+    b'forwarded': 'HTTP_FORWARDED',
+    b'from': 'HTTP_FROM',
+    b'host': 'HTTP_HOST',
+    b'if-match': 'HTTP_IF_MATCH',
+    b'if-modified-since': 'HTTP_IF_MODIFIED_SINCE',
+    b'if-none-match': 'HTTP_IF_NONE_MATCH',
+    b'if-range': 'HTTP_IF_RANGE',
+    b'if-unmodified-since': 'HTTP_IF_UNMODIFIED_SINCE',
+    b'keep-alive': 'HTTP_KEEP_ALIVE',
+    b'max-forwards': 'HTTP_MAX_FORWARDS',
+    b'origin': 'HTTP_ORIGIN',
+    b'pragma': 'HTTP_PRAGMA',
+    b'proxy-authorization': 'HTTP_PROXY_AUTHORIZATION',
+    b'range': 'HTTP_RANGE',
+    b'referer': 'HTTP_REFERER',
+    b'sec-fetch-dest': 'HTTP_SEC_FETCH_DEST',
+    b'sec-fetch-mode': 'HTTP_SEC_FETCH_MODE',
+    b'sec-fetch-site': 'HTTP_SEC_FETCH_SITE',
+    b'sec-fetch-user': 'HTTP_SEC_FETCH_USER',
+    b'te': 'HTTP_TE',
+    b'transfer-encoding': 'HTTP_TRANSFER_ENCODING',
+    b'upgrade': 'HTTP_UPGRADE',
+    b'upgrade-insecure-requests': 'HTTP_UPGRADE_INSECURE_REQUESTS',
+    b'user-agent': 'HTTP_USER_AGENT',
+    b'via': 'HTTP_VIA',
+    b'x-csrftoken': 'HTTP_X_CSRFTOKEN',
+    b'x-forwarded-for': 'HTTP_X_FORWARDED_FOR',
+    b'x-forwarded-host': 'HTTP_X_FORWARDED_HOST',
+    b'x-forwarded-proto': 'HTTP_X_FORWARDED_PROTO',
+    b'x-real-ip': 'HTTP_X_REAL_IP',
+    b'x-requested-with': 'HTTP_X_REQUESTED_WITH',
+}
+# The WSGI environ keys for the request headers clients send most often,
+# keyed by the lower-cased header name. Looking a name up here replaces
+# decoding it and building the key character by character for almost every
+# header a browser sends.
+
+_HEADER_KEY_TABLE = bytes.maketrans(
+    b'abcdefghijklmnopqrstuvwxyz-', b'ABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+)
+# A translation table that upper-cases a header name and turns dashes into
+# underscores ("X-Custom-Thing" -> "X_CUSTOM_THING") in a single
+# bytes.translate() call, for the headers _KNOWN_HEADERS does not cover.
+
+
+def _prefix_lines(prefix, blob):
+    return prefix + blob.replace(b'\r\n', b'\n').replace(b'\n', b'\n' + prefix)
+    # Puts prefix in front of every line of blob for the verbose output. Two
+    # bytes.replace() calls do this in C, rather than splitting blob into
+    # lines and building a new bytes object for each one in Python.
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(128 + signum)
+    # Used as the SIGTERM handler by serve_forever_prefork.
+
+
+class _FileWrapper(object):
+    # The wsgi.file_wrapper the server offers applications (see PEP 3333). An
+    # application returns _FileWrapper(open(path, 'rb')) to send a file, and
+    # finish_response can then stream it with sendfile() instead of reading
+    # it through Python.
+
+    def __init__(self, filelike, block_size=8192):
+        self.filelike = filelike
+        self.block_size = block_size
+        if hasattr(filelike, 'close'):
+            self.close = filelike.close
+            # The server calls result.close() when the response is done, which
+            # closes the file.
+
+    def __iter__(self):
+        read = self.filelike.read
+        while True:
+            data = read(self.block_size)
+            if not data:
+                return
+            yield data
+        # Used when the file cannot be sent with sendfile(): it is read and
+        # sent block by block like any other iterable.
+
+    def remaining(self):
+        try:
+            return os.fstat(self.filelike.fileno()).st_size - self.filelike.tell()
+        except (AttributeError, OSError):
+            return None
+        # The number of bytes left to send, or None when filelike is not a
+        # real file on disk (it has no fileno(), like io.BytesIO).
+
+
+class _EmptyInput(object):
+    # The wsgi.input stream for requests without a body (most GET requests).
+    # It holds no data and no read position, so one shared instance can be
+    # given to every request on every thread.
+
+    def read(self, size=-1):
+        return b''
+
+    def readline(self, size=-1):
+        return b''
+
+    def readlines(self, hint=-1):
+        return []
+
+    def __iter__(self):
+        return iter(())
+
+
+_EMPTY_INPUT = _EmptyInput()
+
+
+class _RequestError(Exception):
+    # Raised by prepare_request for a request the server will not serve. The
+    # connection is answered with status (see error_response) and closed.
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+class _StreamConnection(object):
+    # Used by serve_forever_async. finish_response runs on a worker thread and
+    # sends with the blocking socket methods below; this object passes the
+    # data on to an asyncio StreamWriter running on the event loop's thread.
+
+    def __init__(self, writer, loop, timeout):
+        self.writer = writer
+        self.loop = loop
+        self.timeout = timeout
+
+    async def _write(self, buffers):
+        self.writer.writelines(buffers)
+        await asyncio.wait_for(self.writer.drain(), self.timeout)
+        # drain() waits while the transport's buffer is full, so a slow client
+        # holds up the worker thread instead of the server buffering the whole
+        # response in memory.
+
+    def sendmsg(self, buffers):
+        asyncio.run_coroutine_threadsafe(self._write(buffers), self.loop).result()
+        return sum(map(len, buffers))
+        # Hands the buffers to the event loop and waits until they are written.
+        # Everything is always written, so the full length is returned.
+
+    def sendall(self, data):
+        self.sendmsg([data])
+
+    def sendfile(self, file, offset=0, count=None):
+        file.seek(offset)
+        while count is None or count > 0:
+            data = file.read(65536 if count is None else min(65536, count))
+            if not data:
+                break
+            self.sendmsg([data])
+            if count is not None:
+                count -= len(data)
+        # The event loop owns the socket, so the file is read and written in
+        # blocks rather than with the sendfile() system call.
 
 
 class WSGIServer(object):
@@ -10,8 +207,38 @@ class WSGIServer(object):
     # This is the default socket type for TCP/IP, AF_INET means IPv4
     socket_type = socket.SOCK_STREAM
     # SOCK_STREAM means a TCP socket
-    request_queue_size = 1
-    # The number of requests to queue up before refusing new connections
+    request_queue_size = socket.SOMAXCONN
+    # The number of connections the kernel will queue up (the listen backlog)
+    # before refusing new ones. SOMAXCONN is the system maximum (typically
+    # 128-4096), so bursts of clients wait in the queue while the loop is busy
+    # instead of being reset. The kernel caps it at net.core.somaxconn.
+    rcvbuf_size = 262144
+    sndbuf_size = 262144
+    # The kernel receive and send buffer sizes (256 KiB) for the listening socket
+    # and every accepted client socket. The OS default is often only a few KB,
+    # which caps how much of a large response can be in flight before sendall()
+    # has to wait for the client to ACK. Tune these to suit the link.
+    max_workers = 32
+    # The number of worker threads that handle requests concurrently.
+    recv_buffer_size = 16384
+    # Each connection's request is read into a 16 KiB buffer, which holds the
+    # headers of almost any request in a single recv_into() call.
+    max_header_size = 65536
+    # Connections whose request headers grow past this many bytes are dropped.
+    timeout = 10
+    # Seconds a connection may sit idle waiting for its next request (or stall
+    # halfway through one) before the server closes it.
+    linger_zero = False
+    # Reset connections on close instead of leaving them in TIME_WAIT (see
+    # _on_accept). Off by default because it breaks normal TCP shutdown.
+    verbose = False
+    # Print every request and response to the terminal. Off by default:
+    # formatting and writing the output costs more CPU than serving a small
+    # request, and every worker thread contends for stdout.
+    _date_cache = (0, b'')
+    # The last encoded Date header line and the second it was made for.
+    _parent_pid = None
+    # Set in the worker processes started by serve_forever_prefork.
     
     # When working with web sockets in python (or any other language), you
     # need to specify two key parameters: the address family and the socket type.
@@ -33,7 +260,11 @@ class WSGIServer(object):
     # When combined AF_INET and SOCK_STREAM creates a TCP/IPv4 socket that uses the afforementioned
     # addressing format and transport protocol. It is suitable for protocols like HTTP.
     
-    def __init__(self, server_address):
+    def __init__(self, server_address, verbose=False, reuse_port=False):
+        self.verbose = verbose
+        # Whether to print the requests and responses (see the class attribute).
+        self.reuse_port = reuse_port
+        # Whether other sockets may listen on the same port (see below).
         # Create a listening socket
         self.listen_socket = listen_socket = socket.socket(
             self.address_family,
@@ -56,23 +287,80 @@ class WSGIServer(object):
         # SO_REUSEADDR is the specific option just mentioned (allow address reuse).
         # 1 is a boolean value that enables the option. 0 would disable it.
         
+        if reuse_port:
+            listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # SO_REUSEPORT lets several sockets bind and listen on the same address
+        # and port. The kernel then spreads incoming connections between them,
+        # which is how serve_forever_prefork runs one accept loop per process.
+        # It has to be set on every one of those sockets before bind().
+        
+        self.set_buffer_sizes(listen_socket)
+        # Enlarge the listening socket's receive and send buffers. Setting them
+        # before listen() lets the kernel size the TCP window for accepted
+        # connections accordingly.
+        
         listen_socket.bind(server_address)
         # .bind is a method that binds the listien_socket created above to the
         # server address. This a the IP and port tuple.
         listen_socket.listen(self.request_queue_size)
         # .listien is a method that tells the socket to listien for incomming connections.
-        # It includes request queue size that is set to 1 for this test server.
+        # It includes the request queue size set above.
         host, port = self.listen_socket.getsockname()[:2]
         # This grabs the host and port number from the listen_socket object.
         # .getsockname() returns a tuple of the host and port number.
         # The [:2] slice is used to get the first two elements of the tuple.
-        self.server_name = socket.getfqdn(host)
-        # .getfqdn() stands for get fully qualified domain name. It returns the domain name if 
-        # one is available. If not, you will get the IP address of the server.
+        self._server_host = host
+        # The host is kept so server_name can be looked up later (see below).
         self.server_port = port
         # Assign the port number to the server_port class variable.
-        self.headers_set = []
-        # This returns the headers sent by the client for framework compatability.
+        self.server_address = (server_address[0], port)
+        # The address forked worker processes bind to. Using the real port
+        # matters when server_address asked for any free port (port 0).
+        self.multiprocess = False
+        # Set by serve_forever_prefork when several processes serve requests.
+
+    @functools.cached_property
+    def server_name(self):
+        return socket.getfqdn(self._server_host)
+        # .getfqdn() stands for get fully qualified domain name. It returns the domain name if 
+        # one is available. If not, you will get the IP address of the server.
+        # It may have to do a reverse DNS lookup, which can take seconds, so it
+        # is not called while the server starts up but the first time the name
+        # is needed. cached_property stores the answer for every later request.
+
+    @functools.cached_property
+    def _env_template(self):
+        env = {}
+        # The WSGI environment variables that are the same for every request
+        # are worked out once, when the first request arrives. get_environ
+        # copies this dictionary and only fills in the request specific ones.
+        # The following code snippet does not follow PEP8 conventions
+        # but it's formatted the way it is for demonstration purposes
+        # to emphasize the required variables and their values
+        #
+        # Required WSGI variables
+        env['wsgi.version']      = (1, 0)
+        env['wsgi.url_scheme']   = 'http'
+        env['wsgi.errors']       = sys.stderr
+        env['wsgi.multithread']  = True
+        env['wsgi.multiprocess'] = self.multiprocess
+        env['wsgi.run_once']     = False
+        env['wsgi.file_wrapper'] = _FileWrapper
+        # Required CGI variables
+        env['SERVER_NAME']       = self.server_name       # localhost
+        env['SERVER_PORT']       = str(self.server_port)  # 8888
+        return env
+
+    def set_buffer_sizes(self, sock):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf_size)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf_size)
+        except OSError:
+            pass
+        # SO_RCVBUF and SO_SNDBUF set the size of the kernel buffers behind the
+        # socket. The kernel may clamp (or double) the values it is given, and
+        # some platforms refuse them outright, so errors are ignored, as they
+        # are for TCP_NODELAY in configure_connection.
 
     def set_app(self, application):
         self.application = application
@@ -87,173 +375,782 @@ class WSGIServer(object):
     def serve_forever(self):
         listen_socket = self.listen_socket
         # First, the listien_socket is assigned to a local variable.
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        # A pool of worker threads that run the WSGI application. The event loop
+        # below only accepts connections and reads requests, then hands them to
+        # the pool, so one slow Django view (waiting on a database, cache or
+        # external HTTP call) no longer blocks every other client.
+        self._selector = selectors.DefaultSelector()
+        # DefaultSelector picks the most efficient mechanism the platform offers
+        # (epoll on Linux, kqueue on macOS/BSD). It lets a single thread wait on
+        # the listening socket and every half-read client socket at once, instead
+        # of blocking on one accept() or recv() at a time.
+        self._buffers = {}
+        # For each client connection that is waiting for a complete request,
+        # its read buffer, the number of bytes filled so far and the time by
+        # which the request must arrive, keyed by the connection's socket.
+        self._resumed = deque()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, self._on_wakeup)
+        # Worker threads hand kept-alive connections back to the event loop
+        # through the _resumed queue. Writing a byte to the socket pair wakes
+        # the loop up from select() so it picks them up straight away.
+        listen_socket.setblocking(False)
+        self._selector.register(listen_socket, selectors.EVENT_READ, self._on_accept)
+        # The listening socket is made non-blocking and registered for read
+        # events; a "readable" listening socket means a client is waiting to be
+        # accepted. The data argument is the callback to run when that happens.
+        next_sweep = time.monotonic() + 1
         while True:
-            self.client_connection, client_address = listen_socket.accept()
+            for key, mask in self._selector.select(timeout=1):
+                callback = key.data
+                callback(key.fileobj)
             # while True means that the server will run indefinitely.
-            # .accept() is a method that waits for a client to connect to the server.
-            # It returns a tuple of the client connection and the client address.
-            self.handle_one_request()
-            # After a client connects, the server will handle one request and then
-            # return to the while loop to wait for another client connection.
-            # This is a blocking call, meaning that the server will wait for a client
-            # to connect before continuing. This is a simple way to handle multiple
-            # clients, but it is not the most efficient way. In a production server,
-            # you would want to use threading or multiprocessing to handle multiple
-            # clients at the same time.
-
-    def handle_one_request(self):
-        request_data = self.client_connection.recv(1024)
-        # This line receives the request data from the client connection established in
-        # the serve_forever function above. recv() is used with a parameter for 1024 bytes.
-        # This reads upto 1024 bytes from the client connection socket.
-        self.request_data = request_data = request_data.decode('utf-8')
-        # decodes the bytes (request_data) to a UTF-8 string.
-        print(''.join(
-            f'< {line}\n' for line in request_data.splitlines()
-        ))
+            # .select() waits until at least one registered socket is ready and
+            # returns them. Each ready socket's callback (_on_accept, _on_read or
+            # _on_wakeup) is then called with the socket itself.
+            now = time.monotonic()
+            if now >= next_sweep:
+                self._close_idle(now)
+                next_sweep = now + 1
+                if self._parent_pid is not None and os.getppid() != self._parent_pid:
+                    return
+            # Once a second, connections that have waited longer than timeout
+            # for a request are closed. The select() timeout makes sure this
+            # runs even when no socket is ready. A prefork worker also stops
+            # once its parent has gone (it is adopted by another process, so
+            # getppid() changes), even if the parent was killed with SIGKILL
+            # and could not stop it.
+
+    def serve_forever_prefork(self, workers=None):
+        if not self.reuse_port:
+            raise ValueError('serve_forever_prefork() needs a server created '
+                             'with reuse_port=True')
+        workers = workers or os.cpu_count() or 1
+        # One process per CPU core by default.
+        self.multiprocess = True
+        children = set()
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+        # SIGTERM raises SystemExit, like Ctrl+C raises KeyboardInterrupt, so
+        # the finally block below runs for both.
+        try:
+            for _ in range(workers):
+                children.add(self._start_worker())
+            self.listen_socket.close()
+            # Every worker listens on its own socket, so the parent's one is
+            # closed; otherwise the kernel would keep handing it connections
+            # that nobody accepts.
+            while True:
+                pid, status = os.wait()
+                children.discard(pid)
+                print(f'WSGIServer: worker {pid} exited with code '
+                      f'{os.waitstatus_to_exitcode(status)}, starting a new one',
+                      file=sys.stderr)
+                time.sleep(1)
+                children.add(self._start_worker())
+                # os.wait() blocks until a worker exits, and reaps it so it
+                # does not linger as a zombie. A replacement is started so the
+                # server keeps its number of workers; the pause stops a worker
+                # that fails straight away from being restarted in a busy loop.
+        finally:
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in children:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            # When the parent stops, for any reason, it stops its workers and
+            # waits for them, so no old process is left serving on the port.
+        # The parent process only looks after the workers; it serves no
+        # requests itself, since it could not notice a worker dying while it
+        # was busy in serve_forever().
+
+    def _start_worker(self):
+        parent_pid = os.getpid()
+        pid = os.fork()
+        if pid:
+            return pid
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self.listen_socket.close()
+            worker = WSGIServer(
+                self.server_address, verbose=self.verbose, reuse_port=True
+            )
+            worker.set_app(self.application)
+            worker.multiprocess = True
+            worker._parent_pid = parent_pid
+            worker.serve_forever()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            os._exit(1)
+        # os.fork() makes a copy of this process; it returns 0 in the new child
+        # process and the child's pid in the parent. Each child closes the
+        # listening socket it inherited and opens its own with SO_REUSEPORT, so
+        # every process has its own accept queue and the kernel hands each new
+        # connection to just one of them (no "thundering herd" of processes
+        # woken for the same connection). Separate processes do not share the
+        # GIL, so parsing and application code can use every core. The child
+        # only returns from serve_forever() when the parent has gone;
+        # os._exit() makes sure it never carries on into the parent's code.
+
+    def serve_forever_async(self, use_uvloop=False):
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        # The WSGI application is still ordinary blocking code, so it keeps
+        # running on a pool of worker threads; only the network I/O moves to
+        # the asyncio event loop.
+        loop_factory = None
+        if use_uvloop:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        # uvloop is an optional, faster drop-in replacement for asyncio's event
+        # loop. It is only imported when asked for, and only this server's loop
+        # uses it: the process-wide event loop policy is left alone.
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(self._serve_async())
+        # An alternative to serve_forever that uses asyncio instead of the
+        # hand-written selectors loop. The Runner starts an event loop (a
+        # uvloop one if use_uvloop is set) and runs _serve_async until the
+        # server is stopped.
+
+    async def _serve_async(self):
+        server = await asyncio.start_server(
+            self._handle_stream,
+            sock=self.listen_socket,
+            backlog=self.request_queue_size,
+            limit=self.max_header_size,
+        )
+        async with server:
+            await server.serve_forever()
+        # asyncio.start_server accepts connections on the listening socket
+        # created in __init__ (keeping its options, such as SO_REUSEPORT) and
+        # runs _handle_stream for each one. limit caps how much the reader will
+        # buffer while looking for the end of the headers.
+
+    async def _handle_stream(self, reader, writer):
+        self.configure_connection(writer.get_extra_info('socket'))
+        loop = asyncio.get_running_loop()
+        client_connection = _StreamConnection(writer, loop, self.timeout)
+        # The worker threads send responses through client_connection, which
+        # writes to the asyncio stream as if it were a blocking socket.
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b'\r\n\r\n'), self.timeout
+                    )
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                head = head[:-4]
+                # Each pass of this loop serves one request on the connection,
+                # like handle_connection does. The loop ends when the client
+                # closes the connection, sends headers longer than
+                # max_header_size, or sends nothing for timeout seconds.
+                try:
+                    env, content_length, keep_alive = self.prepare_request(head)
+                except _RequestError as error:
+                    writer.write(self.error_response(error.status))
+                    await asyncio.wait_for(writer.drain(), self.timeout)
+                    break
+                    # A malformed or unsupported request, see handle_connection.
+                if content_length:
+                    body = await asyncio.wait_for(
+                        reader.readexactly(content_length), self.timeout
+                    )
+                    env['wsgi.input'] = io.BytesIO(body)
+                keep_alive = await loop.run_in_executor(
+                    self._pool, self.respond, client_connection, env, keep_alive
+                )
+                # The application runs on a worker thread while the event loop
+                # carries on serving every other connection.
+                if not keep_alive:
+                    break
+        except (ConnectionError, TimeoutError, asyncio.TimeoutError,
+                asyncio.IncompleteReadError):
+            pass
+            # The client went away or stalled; there is nobody left to answer.
+        except Exception:
+            traceback.print_exc()
+        finally:
+            writer.close()
+
+    def _on_accept(self, listen_socket):
+        while True:
+            try:
+                client_connection, client_address = listen_socket.accept()
+            except BlockingIOError:
+                return
+            # .accept() returns a tuple of the client connection and the client
+            # address. Several clients may be waiting, so accept() is called until
+            # the non-blocking socket raises BlockingIOError, meaning the queue
+            # is empty.
+            self.configure_connection(client_connection)
+            # Sets the socket options every client connection gets.
+            self._watch(client_connection)
+            # The new connection is registered with the selector too, so its
+            # request is read whenever bytes arrive without ever blocking the loop.
+
+    def configure_connection(self, client_connection):
+        try:
+            client_connection.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+            )
+        except OSError:
+            pass
+        # TCP_NODELAY disables Nagle's algorithm on the accepted socket. Nagle
+        # holds back small writes while earlier data is still unacknowledged,
+        # which can delay a short HTTP response by tens of milliseconds before
+        # the connection is closed. Not every platform supports the option on
+        # every socket, so any error is simply ignored.
+        self.set_buffer_sizes(client_connection)
+        # Linux does not always carry the buffer sizes over from the listening
+        # socket to the accepted one, so they are set again here.
+        if self.linger_zero:
+            try:
+                client_connection.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0)
+                )
+            except OSError:
+                pass
+        # SO_LINGER with a zero timeout makes close() reset the connection
+        # straight away, so the server side never sits in TIME_WAIT. That
+        # stops closed connections piling up and using up ports when
+        # benchmarks open thousands of them, but anything still waiting in
+        # the kernel buffers is thrown away: unread request bytes, and the
+        # tail of a large response that sendall() handed to the kernel but
+        # the client has not received yet. Keep-alive already avoids most
+        # closes, so this is only worth turning on for connection-rate
+        # benchmarks with small responses. As with TCP_NODELAY, an error
+        # setting the option is ignored.
+
+    def _watch(self, client_connection, buffered=b''):
+        client_connection.setblocking(False)
+        buffer = bytearray(max(self.recv_buffer_size, 2 * len(buffered)))
+        buffer[:len(buffered)] = buffered
+        self._buffers[client_connection] = [
+            buffer, len(buffered), time.monotonic() + self.timeout
+        ]
+        self._selector.register(
+            client_connection, selectors.EVENT_READ, self._on_read
+        )
+        # Registers a connection that is waiting for a request. buffered holds
+        # any bytes of that request which have already been read.
+
+    def _on_read(self, client_connection):
+        state = self._buffers[client_connection]
+        buffer, filled, deadline = state
+        if filled == len(buffer):
+            buffer.extend(bytes(len(buffer)))
+            # The buffer is full, so it is doubled in size.
+        try:
+            with memoryview(buffer)[filled:] as view:
+                received = client_connection.recv_into(view)
+        except BlockingIOError:
+            return
+        except OSError:
+            received = 0
+        # recv_into() writes whatever bytes have arrived straight into the free
+        # end of the buffer, instead of allocating a new bytes object for every
+        # read the way recv() does. A reset connection is treated the same as one
+        # the client closed.
+        if not received:
+            self._close_pending(client_connection)
+            return
+            # An empty read means the client closed the connection, either
+            # between requests or before finishing one.
+        state[1] = filled = filled + received
+        end = buffer.find(b'\r\n\r\n', max(0, filled - received - 3), filled)
+        if end < 0 or end > self.max_header_size:
+            if filled > self.max_header_size:
+                self._close_pending(client_connection)
+            return
+            # A blank line marks the end of the request headers. Only the newly
+            # received bytes (plus three bytes before them, in case the blank line
+            # was split across reads) need searching. Until it arrives the
+            # connection stays registered and the bytes stay buffered. Headers
+            # longer than max_header_size get the connection dropped.
+        self._selector.unregister(client_connection)
+        del self._buffers[client_connection]
+        client_connection.settimeout(self.timeout)
+        self._pool.submit(
+            self.handle_connection, client_connection, bytes(buffer[:filled])
+        )
+        # The request is complete, so the connection leaves the selector and is
+        # handed to a worker thread in ordinary blocking mode, with a timeout so
+        # a stalled client cannot hold on to a worker forever. Threads only help
+        # while the application is waiting on I/O: pure Python work still holds
+        # the GIL, and a C extension that blocks without releasing the GIL will
+        # stall every worker.
+
+    def _on_wakeup(self, wakeup_socket):
+        try:
+            wakeup_socket.recv(4096)
+        except BlockingIOError:
+            pass
+        while self._resumed:
+            client_connection, buffered = self._resumed.popleft()
+            self._watch(client_connection, buffered)
+        # Worker threads have finished with these kept-alive connections, so
+        # they go back to waiting for their next request in the selector.
+
+    def _resume(self, client_connection, buffered):
+        self._resumed.append((client_connection, buffered))
+        try:
+            self._wakeup_w.send(b'\0')
+        except BlockingIOError:
+            pass
+        # Called from a worker thread. The selector is only ever touched by the
+        # event loop's thread, so the connection is queued and the loop is woken
+        # up to register it. If the socket pair is full a wakeup is already
+        # pending, which is just as good.
+
+    def _close_idle(self, now):
+        for client_connection, state in list(self._buffers.items()):
+            if state[2] < now:
+                self._close_pending(client_connection)
+        # Closes connections whose request did not arrive within timeout.
+
+    def _close_pending(self, client_connection):
+        self._selector.unregister(client_connection)
+        del self._buffers[client_connection]
+        client_connection.close()
+        # Forget about a connection that closed before sending a whole request.
+
+    def handle_connection(self, client_connection, buffered):
+        keep_alive = False
+        try:
+            while True:
+                # buffered holds the raw bytes read from the connection so far,
+                # starting with the request read by the event loop in _on_read.
+                # Each pass of this loop serves one request. HTTP/1.1 keeps the
+                # connection open between requests (keep-alive), which saves a
+                # new TCP handshake and slow start for every request.
+                head_end = buffered.find(b'\r\n\r\n')
+                if head_end < 0:
+                    break
+                    # The next request has not fully arrived yet.
+                head = buffered[:head_end]
+                buffered = buffered[head_end + 4:]
+                # The request headers end at the blank line. Whatever follows is
+                # the body, possibly followed by the start of the next request.
+                try:
+                    env, content_length, keep_alive = self.prepare_request(head)
+                except _RequestError as error:
+                    keep_alive = False
+                    self.send_error(client_connection, error.status)
+                    break
+                # Builds the WSGI environment dictionary from the headers (see
+                # prepare_request). A request that cannot be parsed or is not
+                # supported is the client's mistake, so it gets a 4xx response
+                # rather than a traceback, and the connection is closed: after
+                # a bad request there is no telling where the next one would
+                # begin.
+                if len(buffered) < content_length:
+                    buffered = bytearray(buffered)
+                    while len(buffered) < content_length:
+                        data = client_connection.recv(self.recv_buffer_size)
+                        if not data:
+                            raise ConnectionResetError
+                        buffered += data
+                    buffered = bytes(buffered)
+                    # Back to bytes, so the headers of a pipelined request that
+                    # follows can be used as dictionary keys in parse_headers.
+                if content_length:
+                    env['wsgi.input'] = io.BytesIO(buffered[:content_length])
+                    buffered = buffered[content_length:]
+                # Content-Length says exactly how long the body is, which is
+                # how the server knows where the next request on the
+                # connection begins. Any part of the body that has not arrived
+                # yet is read here. A new input stream is only made for
+                # requests that have a body.
+                keep_alive = self.respond(client_connection, env, keep_alive)
+                # Runs the application and sends its response (see respond).
+                if not keep_alive:
+                    break
+        except (ConnectionError, TimeoutError):
+            keep_alive = False
+            # The client went away or stalled; there is nobody left to answer.
+        except Exception:
+            keep_alive = False
+            traceback.print_exc()
+            # Exceptions raised inside a worker thread would otherwise be stored
+            # on a Future that nobody looks at, so they are printed here instead.
+        if keep_alive:
+            self._resume(client_connection, buffered)
+            # The connection goes back to the event loop to wait for its next
+            # request, instead of tying up this worker thread while it is idle.
+        else:
+            client_connection.close()
+            # This line closes the client connection. This is important because
+            # it frees up resources and allows the server to handle new client
+            # connections.
+
+
+    # Below are the class methods that are used in the above code.
+
+    def prepare_request(self, head):
+        # head holds the raw request headers, without the blank line that ends
+        # them. Both handle_connection and _handle_stream call this, then read
+        # the body themselves.
+        if __debug__ and self.verbose:
+            sys.stdout.buffer.write(_prefix_lines(b'< ', head) + b'\n\n')
+            sys.stdout.buffer.flush()
         # This debugging output is particularly useful when learning how web
         # servers work or when troubleshooting issues with your WSGI application.
         # It shows the raw HTTP request data received from the client in the
         # terminal, which can help you understand how the server is
         # interpreting the request and what headers are being sent. "<" signifies
-        # incoming data, while ">" signifies outgoing data.
-
-        self.parse_request(request_data)
-        # The decoded request data is passed to the parse_request class method.
-        # This method breaks down the request data into its defined components.
-        # These components are then used to construct the WSGI environment
-        # dictionary that is passed to the WSGI application callable.
-        env = self.get_environ()
+        # incoming data, while ">" signifies outgoing data. The raw bytes are
+        # written as one blob straight to stdout's binary buffer, skipping
+        # the decode and print(). It only runs when verbose is set.
+        try:
+            request_method, path, request_version = self.parse_request(head)
+        except ValueError:
+            raise _RequestError('400 Bad Request') from None
+        headers = self.parse_headers(head)
+        # The raw header bytes are passed to the parse_request and
+        # parse_headers class methods. They break down the request data
+        # into its defined components. These components are then used to
+        # construct the WSGI environment dictionary that is passed to the
+        # WSGI application callable.
+        content_length = headers.get('CONTENT_LENGTH') or '0'
+        if not (content_length.isascii() and content_length.isdigit()):
+            raise _RequestError('400 Bad Request')
+        content_length = int(content_length)
+        # Content-Length decides where this request ends and the next one
+        # starts, so anything but plain digits is refused. int() alone would
+        # accept "-5" or " +5", and a negative length would make the server
+        # read part of this body as the next request (request smuggling).
+        # A header sent twice is joined into "5,5" and refused as well.
+        if 'HTTP_TRANSFER_ENCODING' in headers:
+            raise _RequestError('411 Length Required')
+        # Chunked request bodies are not supported. Rather than running the
+        # application with an empty body (and then reading the chunks as the
+        # next request), the client is told to send a Content-Length instead.
+        env = self.get_environ(request_method, path, request_version, headers)
         # Here I contruct the just mentioned WSGI environment dictionary.
         # Here is all the information that is passed to the WSGI application
         # callable. This includes the request method, path, server name,
         # server port, and other necessary information using the class method
         # get_environ().
+        keep_alive = self.wants_keep_alive(request_version, headers)
+        return env, content_length, keep_alive
+        # The caller reads content_length bytes of body, which become
+        # wsgi.input, and keeps the connection open if keep_alive is true.
 
-        result = self.application(env, self.start_response)
+    def respond(self, client_connection, env, keep_alive):
+        headers_set = []
+        try:
+            result = self.application(
+                env, functools.partial(self.start_response, headers_set)
+            )
+        except Exception:
+            self.send_error(client_connection, '500 Internal Server Error')
+            raise
         # This line starts the WSGI compatible application (in this case Django)
         # callable with the environment dictionary and the start_response
         # class method that is used to set the response status and headers.
-
-        self.finish_response(result)
+        # Each request gets its own headers_set list, bound to start_response
+        # with functools.partial, so two threads never overwrite each other's
+        # status and headers.
+        try:
+            return self.finish_response(
+                client_connection, headers_set, result, keep_alive,
+                env['REQUEST_METHOD'],
+            )
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
         # This contructs a HTTP response from the result returned by the WSGI
         # compatible application (Django) stored in result. This includes the
-        # status code, headers and body returned by the application. Once this
-        # is sent to the client, the connection is closed.
+        # status code, headers and body returned by the application.
         # The finish_response method is responsible for sending the HTTP response
         # back to the client. It constructs the response headers and body,
         # encodes them to bytes, and sends them over the client connection.
-        # Finally, it closes the client connection to free up resources.
-
-
-    # Below are the class methods that are used in the above code.
+        # It returns whether the connection is being kept open.
+        # If the application raises before anything has been sent, the client
+        # gets a 500 response instead of a connection that just closes; the
+        # exception is then passed on so handle_connection prints it and closes
+        # the connection.
+        # The WSGI specification requires calling result.close() if it exists;
+        # Django uses it to fire request_finished, which releases the worker
+        # thread's database connections.
     
-    def parse_request(self, text):
-        # The request_data is passed to this method as a decoded UTF-8 string.
-        request_line = text.splitlines()[0]
-        # This line splits the request data into lines and takes the first line
-        # which contains the request line. The request line is the first line
-        # of the HTTP request and contains the request method, path, and HTTP version.
-        request_line = request_line.rstrip('\r\n')
-        # This line removes the trailing carriage return and newline characters
-        # from the request line. This is important because the request line
-        # is a string and we want to remove any extra whitespace or formatting
-        # characters that may have been added by the client or the server.
+    def parse_request(self, raw):
+        # The request headers are passed to this method as raw bytes.
+        eol = raw.find(b'\r\n')
+        request_line = raw[:eol] if eol >= 0 else raw
+        # The request line is the first line of the HTTP request and contains
+        # the request method, path, and HTTP version. Only that line is sliced
+        # out of the buffer; the rest of the headers are neither split into
+        # lines nor decoded here.
         
         # The request line is formatted as follows:
-        (self.request_method,  # GET
-         self.path,            # /hello
-         self.request_version  # HTTP/1.1
-         ) = request_line.split()
+        (request_method,  # GET
+         path,            # /hello
+         request_version  # HTTP/1.1
+         ) = request_line.split(b' ', 2)
+        request_method = request_method.decode('latin-1')
+        path = path.decode('latin-1')
+        request_version = request_version.decode('latin-1')
+        # Only these three short tokens are decoded. The WSGI specification
+        # (PEP 3333) says environ strings hold the raw bytes decoded as latin-1,
+        # which can never fail, unlike ASCII or UTF-8.
+        return request_method, path, request_version
+        # The parts are returned rather than stored on self, since the server
+        # object is shared by every worker thread.
 
-    def get_environ(self):
-        env = {}
-        # The following code snippet does not follow PEP8 conventions
-        # but it's formatted the way it is for demonstration purposes
-        # to emphasize the required variables and their values
-        #
-        # Required WSGI variables
-        env['wsgi.version']      = (1, 0)
-        env['wsgi.url_scheme']   = 'http'
-        env['wsgi.input']        = io.StringIO(self.request_data)
-        env['wsgi.errors']       = sys.stderr
-        env['wsgi.multithread']  = False
-        env['wsgi.multiprocess'] = False
-        env['wsgi.run_once']     = False
-        # Required CGI variables
-        env['REQUEST_METHOD']    = self.request_method    # GET
-        env['PATH_INFO']         = self.path              # /hello
-        env['SERVER_NAME']       = self.server_name       # localhost
-        env['SERVER_PORT']       = str(self.server_port)  # 8888
+    def parse_headers(self, raw):
+        headers = {}
+        for line in raw.split(b'\r\n')[1:]:
+            name, separator, value = line.partition(b':')
+            if not separator:
+                continue
+            # Each header line after the request line is "Name: value".
+            name = name.strip()
+            key = _KNOWN_HEADERS.get(name.lower())
+            if key is None:
+                if b'_' in name:
+                    continue
+                    # "X_Forwarded_For" would get the same key as
+                    # "X-Forwarded-For" and could be used to spoof it, so
+                    # names with underscores are dropped, as wsgiref and
+                    # gunicorn do.
+                key = (b'HTTP_' + name.translate(_HEADER_KEY_TABLE)).decode('latin-1')
+            # WSGI passes request headers in the environ under CGI style keys:
+            # "User-Agent" becomes HTTP_USER_AGENT. Content-Type and
+            # Content-Length are the two exceptions that have no HTTP_ prefix.
+            # Common headers (including those two) are looked up in
+            # _KNOWN_HEADERS; only unusual ones have their key built here, with
+            # _HEADER_KEY_TABLE.
+            value = value.strip().decode('latin-1')
+            if key in headers:
+                value = headers[key] + ',' + value
+            headers[key] = value
+            # A header sent more than once is combined into one comma separated
+            # value, as HTTP allows.
+        return headers
+
+    def wants_keep_alive(self, request_version, headers):
+        connection = headers.get('HTTP_CONNECTION')
+        if not connection:
+            return request_version == 'HTTP/1.1'
+        connection = connection.lower()
+        if request_version == 'HTTP/1.1':
+            return 'close' not in connection
+        return 'keep-alive' in connection
+        # HTTP/1.1 connections stay open unless the client sends
+        # "Connection: close"; HTTP/1.0 ones close unless the client asks for
+        # "Connection: keep-alive". Most requests send no Connection header at
+        # all, which is checked first.
+
+    def get_environ(self, request_method, path, request_version, headers):
+        env = self._env_template.copy()
+        # Starts from the variables that never change (see _env_template).
+        env['wsgi.input']        = _EMPTY_INPUT
+        # Replaced by the caller when the request has a body.
+        env['REQUEST_METHOD']    = request_method         # GET
+        env['PATH_INFO']         = path                   # /hello
+        env['SERVER_PROTOCOL']   = request_version        # HTTP/1.1
+        env.update(headers)
+        # The request headers (HTTP_HOST, CONTENT_LENGTH, ...)
         return env
 
-    def start_response(self, status, response_headers, exc_info=None):
-        current_date = datetime.datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S GMT')
-        # This line gets the current date and time in UTC format.
-        # The strftime method formats the date and time according to the
-        # specified format string. The format string used here is the
-        # RFC 1123 date format, which is the standard format for HTTP
-        # date headers.
-        
-        # Add necessary server headers
-        server_headers = [
-            # set server date dynamically
-            ('Date', f'{current_date}'),
-            ('Server', 'WSGIServer 0.2'),
-        ]
-        self.headers_set = [status, response_headers + server_headers]
+    def start_response(self, headers_set, status, response_headers, exc_info=None):
+        now = int(time.time())
+        cached_at, current_date = WSGIServer._date_cache
+        if cached_at != now:
+            current_date = email.utils.formatdate(now, usegmt=True)
+            current_date = f'Date: {current_date}\r\n'.encode('ascii')
+            WSGIServer._date_cache = (now, current_date)
+        # This gets the current date and time in the RFC 1123 format HTTP
+        # uses for Date headers, e.g. "Thu, 15 Oct 2026 12:00:00 GMT".
+        # The header only has one second resolution, so the encoded line
+        # is cached and only rebuilt when the second changes; every other
+        # request in the same second reuses it. email.utils.formatdate
+        # produces the HTTP format directly and is cheaper than strftime.
+        # The cache is a single tuple, so threads replacing it never see a
+        # half-updated value.
+        headers_set[:] = [status, response_headers, current_date]
+        # headers_set is the per-request list created in handle_connection.
+        # The Date line is the only server header that changes, so it is kept
+        # alongside the application's headers; the rest are added as
+        # ready-made bytes in finish_response.
         # To adhere to WSGI specification the start_response must return
         # a 'write' callable. We simplicity's sake we'll ignore that detail
         # for now.
         # return self.finish_response
 
-    def finish_response(self, result):
+    def finish_response(self, client_connection, headers_set, result, keep_alive,
+                        request_method):
         try:
-            status, response_headers = self.headers_set
-            # Extract the status and response headers from the headers_set above.
-            response = f'HTTP/1.1 {status}\r\n'
-            # Creates the first line of the HTTP response with the version and
-            # status code.
-            for header in response_headers:
-                response += '{0}: {1}\r\n'.format(*header)
-                # Iterates through each header tuple (name, value) and formats them
-                # as key-value pairs
-            response += '\r\n'
-            # This line adds a blank line to separate the headers from the body.
-            # This is a standard HTTP response format.
-            for data in result:
-                response += data.decode('utf-8')
-                # The result parameter is an iterable returned by the WSGI application
-                # (Django). Each item is decoded to a UTF-8 string and added to the response.
-            print(''.join(
-                f'> {line}\n' for line in response.splitlines()
-            ))
-            # Another debugging output that shows the ">" outgoing HTTP response data
-            # in the terminal. This is useful for understanding what the server
-            # is sending back to the client and for troubleshooting issues with
-            # the response.
-            response_bytes = response.encode()
-            # This line encodes the response string to bytes. This is necessary
-            # because the client connection expects the response to be in bytes.
-            self.client_connection.sendall(response_bytes)
-            # .sendall() is a method that sends the response bytes to the client
-            # connection.
-        finally:
-            self.client_connection.close()
-            # This line closes the client connection. This is important because
-            # it frees up resources and allows the server to handle new client
-            # connections.
+            (parts, body, rest, file_length, content_length,
+             keep_alive) = self.prepare_response(
+                headers_set, result, keep_alive, request_method
+            )
+        except Exception:
+            self.send_error(client_connection, '500 Internal Server Error')
+            raise
+        # Everything that can go wrong in the application (start_response never
+        # called, a generator failing on its first step, a bad header) happens
+        # in prepare_response, before any byte of the response is sent, so the
+        # client can still be told about it with a 500 response.
+        if file_length is not None:
+            self.send_parts(client_connection, parts)
+            file = result.filelike
+            client_connection.sendfile(file, file.tell(), content_length)
+            return keep_alive
+            # .sendfile() has the kernel copy the file straight from the page
+            # cache to the socket (os.sendfile), so its contents never pass
+            # through Python at all. Only the headers are sent from parts.
+        parts.extend(body)
+        self.send_parts(client_connection, parts)
+        for data in rest:
+            if data:
+                self.send_parts(client_connection, [data])
+        # Sends the headers and body. Closing the connection is left to
+        # handle_connection.
+        return keep_alive
+
+    def prepare_response(self, headers_set, result, keep_alive, request_method):
+        file_length = None
+        if isinstance(result, _FileWrapper):
+            file_length = result.remaining()
+        if isinstance(result, (list, tuple)) or file_length is not None:
+            body, rest = result, ()
+        else:
+            rest = iter(result)
+            body = [next(rest, b'')]
+        # The result parameter is an iterable returned by the WSGI application
+        # (Django). WSGI applications already yield bytes, so the chunks are
+        # sent as they are without decoding them. A list or tuple is sent in
+        # one go with the headers. Any other iterable may be a long stream, so
+        # only its first chunk goes with the headers and the rest are sent one
+        # by one as they are produced. Taking that first chunk also lets
+        # generator applications call start_response on their first step.
+        # A file from wsgi.file_wrapper is sent separately, after the headers.
+        status, response_headers, date_header = headers_set
+        # Extract the status, response headers and Date line from the
+        # headers_set above.
+        parts = [_HTTP11_PREFIX, status.encode('ascii'), _CRLF]
+        # The response is collected as a list of bytes fragments. This first
+        # fragment is the status line with the HTTP version and status code.
+        content_length = None
+        for name, value in response_headers:
+            lowered = name.lower()
+            if lowered == 'connection':
+                if value.lower() == 'close':
+                    keep_alive = False
+                continue
+            # The server sends its own Connection header below, but still honours
+            # an application that asks for the connection to be closed.
+            if lowered == 'content-length':
+                content_length = int(value)
+            parts.append(f'{name}: {value}\r\n'.encode('latin-1'))
+            # Iterates through each header tuple (name, value) and formats them
+            # as key-value pairs. HTTP header values are latin-1 encoded.
+        bodyless = status[:1] == '1' or status[:3] in ('204', '304')
+        if content_length is None and not bodyless:
+            if rest:
+                if request_method != 'HEAD':
+                    keep_alive = False
+            else:
+                if file_length is not None:
+                    content_length = file_length
+                else:
+                    content_length = sum(map(len, body))
+                parts.append(b'Content-Length: %d\r\n' % content_length)
+            # A kept-alive connection needs a Content-Length so the client knows
+            # where this response ends. When the whole body is already in memory,
+            # or is the rest of a file, it can be worked out if the application
+            # did not send one.
+            # Otherwise the end of the body is marked by closing the
+            # connection. 1xx, 204 and 304 responses never have a body.
+        if bodyless or request_method == 'HEAD':
+            body, rest, file_length = (), (), None
+        # Those responses, and every response to a HEAD request, end at the
+        # blank line after the headers. A HEAD response keeps the headers a GET
+        # would get (Content-Length included), but applications such as Django
+        # still return the whole body, which has to be dropped here: on a
+        # kept-alive connection the client would read it as the start of the
+        # next response. Clearing file_length stops finish_response from
+        # sending a file from wsgi.file_wrapper as well.
+        parts.append(date_header)
+        parts.append(_SERVER_HEADER)
+        parts.append(_KEEP_ALIVE_HEADER if keep_alive else _CLOSE_HEADER)
+        # The server's own headers are appended already encoded.
+        parts.append(_CRLF)
+        # This line adds a blank line to separate the headers from the body.
+        # This is a standard HTTP response format.
+        return parts, body, rest, file_length, content_length, keep_alive
+        # finish_response sends the parts, then the body (or the file).
+
+    def error_response(self, status):
+        return b''.join([
+            _HTTP11_PREFIX, status.encode('ascii'), _CRLF,
+            _SERVER_HEADER,
+            b'Content-Length: 0\r\n',
+            _CLOSE_HEADER,
+            _CRLF,
+        ])
+        # A minimal response with no body, sent when the server cannot answer
+        # a request normally. The connection is always closed afterwards.
+
+    def send_error(self, client_connection, status):
+        try:
+            client_connection.sendall(self.error_response(status))
+        except OSError:
+            pass
+            # The client may already be gone; the connection is closed anyway.
+
+    def send_parts(self, client_connection, parts):
+        if __debug__ and self.verbose:
+            sys.stdout.buffer.write(_prefix_lines(b'> ', b''.join(parts)) + b'\n\n')
+            sys.stdout.buffer.flush()
+        # Another debugging output that shows the ">" outgoing HTTP response data
+        # in the terminal. This is useful for understanding what the server
+        # is sending back to the client and for troubleshooting issues with
+        # the response. Formatting it costs more than sending the response
+        # for small responses, so it only runs when verbose is set.
+        if not _HAS_SENDMSG:
+            client_connection.sendall(b''.join(parts))
+            return
+            # .sendall() is a method that sends the bytes to the client
+            # connection. The fragments have to be joined into one buffer first.
+        while parts:
+            sent = client_connection.sendmsg(parts[:_IOV_MAX])
+            for index, part in enumerate(parts):
+                if sent < len(part):
+                    break
+                sent -= len(part)
+            else:
+                return
+            parts = parts[index:]
+            parts[0] = memoryview(parts[0])[sent:]
+        # .sendmsg() hands the kernel the whole list of fragments in a single
+        # call (scatter/gather I/O), so they never have to be copied into one
+        # joined buffer. Like send(), it may send only part of the data: the
+        # fragments that went out in full are dropped, the first unsent one is
+        # trimmed with a memoryview (again without copying), and the rest are
+        # sent on the next pass.
 
 SERVER_ADDRESS = (HOST, PORT) = '', 8888
 # The server address constants are defined here.
 
 
-def make_server(server_address, application):
-    server = WSGIServer(server_address)
+def make_server(server_address, application, verbose=False, reuse_port=False):
+    server = WSGIServer(server_address, verbose=verbose, reuse_port=reuse_port)
     # This line creates a new WSGIServer object, passing in the server address
     # (a tuple containing host and port). This triggers the __init__ method code,
     # which sets up the socket, binds it to the address and prepares to listien for
-    # incoming connections.
+    # incoming connections. verbose turns on the request/response printing and
+    # reuse_port is needed for serve_forever_prefork.
     server.set_app(application)
     # This calls the set_app class method to attach the WSGI application (in this case Django)
     # to the server, so the server knows what application should handle incoming requests.
@@ -287,9 +1184,25 @@ if __name__ == '__main__':
     # getattr is a built-in function that gets an attribute (in this case the
     # Django settings file) from an object (in this case the module).
     # The application callable is the entry point for the WSGI application.
-    httpd = make_server(SERVER_ADDRESS, application)
+    verbose = '--verbose' in sys.argv[2:]
+    # Passing --verbose after the application prints every request and response.
+    prefork = '--prefork' in sys.argv[2:]
+    # Passing --prefork runs one server process per CPU core.
+    use_uvloop = '--uvloop' in sys.argv[2:]
+    use_asyncio = use_uvloop or '--asyncio' in sys.argv[2:]
+    # Passing --asyncio serves connections from an asyncio event loop;
+    # --uvloop does the same with uvloop's faster event loop.
+    if prefork and use_asyncio:
+        sys.exit('--prefork cannot be combined with --asyncio or --uvloop')
+    httpd = make_server(SERVER_ADDRESS, application, verbose=verbose,
+                        reuse_port=prefork)
     # The make_server function is called to create a new WSGIServer
     # instance, passing in the server address and the application specified above.
     print(f'WSGIServer: Serving HTTP on port {PORT} ...\n')
-    httpd.serve_forever()
+    if prefork:
+        httpd.serve_forever_prefork()
+    elif use_asyncio:
+        httpd.serve_forever_async(use_uvloop=use_uvloop)
+    else:
+        httpd.serve_forever()
     # The serve_forever  class method is called to start the server and begin.
\ No newline at end of file
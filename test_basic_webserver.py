@@ -0,0 +1,395 @@
+import contextlib
+import functools
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import basic_webserver
+from basic_webserver import make_server
+
+
+def echo_app(environ, start_response):
+    body = environ['REQUEST_METHOD'].encode() + b' ' + environ['PATH_INFO'].encode()
+    body += b' ' + environ['wsgi.input'].read()
+    start_response('200 OK', [('Content-Type', 'text/plain'),
+                              ('Content-Length', str(len(body)))])
+    return [body]
+
+
+class ServerTestCase(unittest.TestCase):
+    # Each test starts a real server on a free port in a background thread and
+    # talks to it over a plain socket.
+
+    application = staticmethod(echo_app)
+    serve = 'serve_forever'
+
+    def setUp(self):
+        self.server = make_server(('127.0.0.1', 0), self.application)
+        serve = getattr(self.server, self.serve)
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+
+    def request(self, *chunks):
+        # Sends each chunk separately (with a short pause so they arrive as
+        # separate reads) and returns everything the server sends back until it
+        # closes the connection.
+        client = socket.create_connection(self.server.server_address, timeout=5)
+        with client:
+            for chunk in chunks:
+                client.sendall(chunk)
+                time.sleep(0.1)
+            response = b''
+            while True:
+                data = client.recv(65536)
+                if not data:
+                    return response
+                response += data
+
+
+class WSGIServerTests(ServerTestCase):
+
+    def test_pipelined_request_after_split_body(self):
+        response = self.request(
+            b'POST /first HTTP/1.1\r\nContent-Length: 10\r\n\r\n01234',
+            b'56789GET /next HTTP/1.1\r\nConnection: close\r\n\r\n',
+        )
+        self.assertEqual(response.count(b'HTTP/1.1 200 OK'), 2)
+        self.assertIn(b'POST /first 0123456789', response)
+        self.assertTrue(response.endswith(b'GET /next '))
+
+    def read_response(self, client):
+        # Reads exactly one response, using its Content-Length.
+        response = b''
+        while b'\r\n\r\n' not in response:
+            response += client.recv(65536)
+        head, _, body = response.partition(b'\r\n\r\n')
+        length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+        while len(body) < length:
+            body += client.recv(65536)
+        return head, body
+
+    def test_keep_alive_request_in_separate_read(self):
+        # The second request arrives after the first response has been sent,
+        # so the connection has gone back to wait in the event loop.
+        client = socket.create_connection(self.server.server_address, timeout=5)
+        with client:
+            for path in (b'/first', b'/second', b'/third'):
+                client.sendall(b'GET ' + path + b' HTTP/1.1\r\n\r\n')
+                head, body = self.read_response(client)
+                self.assertIn(b'Connection: keep-alive', head)
+                self.assertEqual(body, b'GET ' + path + b' ')
+                time.sleep(0.1)
+
+    def test_idle_connection_is_closed(self):
+        self.server.timeout = 1
+        client = socket.create_connection(self.server.server_address, timeout=5)
+        with client:
+            client.sendall(b'GET / HTTP/1.1\r\n\r\n')
+            self.read_response(client)
+            started = time.monotonic()
+            self.assertEqual(client.recv(65536), b'')
+            self.assertLess(time.monotonic() - started, 4)
+            # Closed after about a second, not left open until the client's
+            # own five second timeout.
+
+    def test_head_response_has_no_body(self):
+        response = self.request(
+            b'HEAD /first HTTP/1.1\r\n\r\n'
+            b'GET /next HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )
+        head, _, rest = response.partition(b'\r\n\r\n')
+        self.assertIn(b'Content-Length: 12', head)
+        self.assertTrue(rest.startswith(b'HTTP/1.1 200 OK\r\n'))
+        self.assertTrue(response.endswith(b'GET /next '))
+
+    def test_negative_content_length_is_rejected(self):
+        response = self.request(
+            b'POST /first HTTP/1.1\r\nContent-Length: -5\r\n\r\n'
+            b'GET /smuggled HTTP/1.1\r\n\r\n'
+        )
+        self.assertTrue(response.startswith(b'HTTP/1.1 400 Bad Request\r\n'))
+        self.assertIn(b'Connection: close', response)
+        self.assertNotIn(b'smuggled', response)
+
+    def test_non_numeric_content_length_is_rejected(self):
+        response = self.request(
+            b'POST / HTTP/1.1\r\nContent-Length: abc\r\n\r\n'
+        )
+        self.assertTrue(response.startswith(b'HTTP/1.1 400 Bad Request\r\n'))
+
+    def test_chunked_request_is_rejected(self):
+        response = self.request(
+            b'POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n'
+            b'5\r\nhello\r\n0\r\n\r\n'
+        )
+        self.assertTrue(response.startswith(b'HTTP/1.1 411 Length Required\r\n'))
+        self.assertIn(b'Connection: close', response)
+        self.assertNotIn(b'200 OK', response)
+
+    def test_malformed_request_line_is_rejected(self):
+        response = self.request(b'GARBAGE\r\n\r\n')
+        self.assertTrue(response.startswith(b'HTTP/1.1 400 Bad Request\r\n'))
+
+
+FILE_CONTENT = os.urandom(300000)
+
+
+def file_app(path, environ, start_response):
+    status = '304 Not Modified' if environ['PATH_INFO'] == '/cached' else '200 OK'
+    start_response(status, [('Content-Type', 'application/octet-stream')])
+    return environ['wsgi.file_wrapper'](open(path, 'rb'))
+
+
+class FileWrapperTests(ServerTestCase):
+    # Files returned through wsgi.file_wrapper are sent with sendfile().
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(FILE_CONTENT)
+        self.addCleanup(os.unlink, file.name)
+        self.application = functools.partial(file_app, file.name)
+        super().setUp()
+
+    def test_file_is_sent(self):
+        response = self.request(
+            b'GET / HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )
+        head, _, body = response.partition(b'\r\n\r\n')
+        self.assertIn(b'Content-Length: 300000', head)
+        self.assertEqual(body, FILE_CONTENT)
+
+    def test_head_sends_no_file(self):
+        response = self.request(
+            b'HEAD / HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )
+        self.assertIn(b'Content-Length: 300000', response)
+        self.assertTrue(response.endswith(b'\r\n\r\n'))
+
+    def test_not_modified_sends_no_file(self):
+        response = self.request(
+            b'GET /cached HTTP/1.1\r\nConnection: close\r\n\r\n'
+        )
+        self.assertTrue(response.startswith(b'HTTP/1.1 304 Not Modified\r\n'))
+        self.assertTrue(response.endswith(b'\r\n\r\n'))
+
+
+class AsyncFileWrapperTests(FileWrapperTests):
+
+    serve = 'serve_forever_async'
+
+
+def forwarded_app(environ, start_response):
+    body = environ.get('HTTP_X_FORWARDED_FOR', '').encode()
+    start_response('200 OK', [('Content-Length', str(len(body)))])
+    return [body]
+
+
+class HeaderTests(ServerTestCase):
+
+    application = staticmethod(forwarded_app)
+
+    def test_header_with_underscore_is_dropped(self):
+        response = self.request(
+            b'GET / HTTP/1.1\r\nX-Forwarded-For: 10.0.0.1\r\n'
+            b'X_Forwarded_For: 6.6.6.6\r\nConnection: close\r\n\r\n'
+        )
+        self.assertTrue(response.endswith(b'\r\n\r\n10.0.0.1'))
+
+
+class AsyncWSGIServerTests(WSGIServerTests):
+    # The same tests against serve_forever_async.
+
+    serve = 'serve_forever_async'
+
+
+def failing_app(environ, start_response):
+    if environ['PATH_INFO'] == '/generator':
+        return failing_generator(start_response)
+    if environ['PATH_INFO'] == '/no-start-response':
+        return [b'never sent']
+    raise RuntimeError('application error')
+
+
+def failing_generator(start_response):
+    raise RuntimeError('application error')
+    yield b''
+
+
+class ApplicationErrorTests(ServerTestCase):
+    # An application that fails before its headers are sent should produce a
+    # 500 response, not a connection that closes without a word.
+
+    application = staticmethod(failing_app)
+
+    def request(self, *chunks):
+        with contextlib.redirect_stderr(io.StringIO()):
+            return super().request(*chunks)
+        # The server prints the application's traceback; keep it out of the
+        # test output.
+
+    def assert_server_error(self, path):
+        response = self.request(b'GET ' + path + b' HTTP/1.1\r\n\r\n')
+        self.assertTrue(
+            response.startswith(b'HTTP/1.1 500 Internal Server Error\r\n')
+        )
+        self.assertIn(b'Connection: close', response)
+
+    def test_application_raises(self):
+        self.assert_server_error(b'/')
+
+    def test_generator_raises_on_first_step(self):
+        self.assert_server_error(b'/generator')
+
+    def test_start_response_not_called(self):
+        self.assert_server_error(b'/no-start-response')
+
+
+class AsyncApplicationErrorTests(ApplicationErrorTests):
+
+    serve = 'serve_forever_async'
+
+
+class ShortSendConnection(object):
+    # Stands in for a socket whose sendmsg() sends at most chunk bytes a call.
+
+    def __init__(self, chunk):
+        self.chunk = chunk
+        self.sent = b''
+        self.calls = []
+
+    def sendmsg(self, buffers):
+        self.calls.append(len(buffers))
+        data = b''.join(buffers)[:self.chunk]
+        self.sent += data
+        return len(data)
+
+
+@unittest.skipUnless(basic_webserver._HAS_SENDMSG, 'needs socket.sendmsg')
+class SendPartsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = make_server(('127.0.0.1', 0), echo_app)
+        self.addCleanup(self.server.listen_socket.close)
+
+    def test_short_sends_are_resumed(self):
+        parts = [b'HTTP/1.1 200 OK\r\n', b'', b'abc', b'0123456789' * 5]
+        for chunk in (1, 4, 7, 16, 1000):
+            connection = ShortSendConnection(chunk)
+            self.server.send_parts(connection, list(parts))
+            self.assertEqual(connection.sent, b''.join(parts))
+
+    def test_fragments_are_sent_in_batches(self):
+        parts = [b'%d,' % number for number in range(3000)]
+        connection = ShortSendConnection(1000000)
+        self.server.send_parts(connection, list(parts))
+        self.assertEqual(connection.sent, b''.join(parts))
+        self.assertEqual(connection.calls, [1024, 1024, 952])
+
+    def test_many_fragments_with_short_sends(self):
+        parts = [b'%d,' % number for number in range(3000)]
+        connection = ShortSendConnection(999)
+        self.server.send_parts(connection, list(parts))
+        self.assertEqual(connection.sent, b''.join(parts))
+        self.assertLessEqual(max(connection.calls), basic_webserver._IOV_MAX)
+
+
+PREFORK_SCRIPT = """
+import os
+import basic_webserver
+from basic_webserver import make_server
+
+def pid_app(environ, start_response):
+    body = str(os.getpid()).encode()
+    start_response('200 OK', [('Content-Length', str(len(body)))])
+    return [body]
+
+server = make_server(('127.0.0.1', 0), pid_app, reuse_port=True)
+print(server.server_port, flush=True)
+server.serve_forever_prefork(2)
+"""
+
+
+@unittest.skipUnless(hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT'),
+                     'needs os.fork and SO_REUSEPORT')
+class PreforkTests(unittest.TestCase):
+    # serve_forever_prefork runs in its own process, started from a script.
+
+    def setUp(self):
+        self.parent = subprocess.Popen(
+            [sys.executable, '-c', PREFORK_SCRIPT],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self.addCleanup(self.stop_parent)
+        self.port = int(self.parent.stdout.readline())
+
+    def stop_parent(self):
+        if self.parent.poll() is None:
+            self.parent.terminate()
+            self.parent.wait(5)
+        self.parent.stdout.close()
+        self.parent.stderr.close()
+
+    def worker_pid(self):
+        # Returns the pid of the worker that served a request, retrying while
+        # the workers are still starting up.
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), 1) as client:
+                    client.sendall(b'GET / HTTP/1.1\r\nConnection: close\r\n\r\n')
+                    response = b''
+                    while True:
+                        data = client.recv(4096)
+                        if not data:
+                            break
+                        response += data
+                return int(response.partition(b'\r\n\r\n')[2])
+            except (OSError, ValueError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    def assert_port_closed(self):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), 1).close()
+            except ConnectionRefusedError:
+                return
+            time.sleep(0.1)
+        self.fail('workers are still serving')
+
+    def test_sigterm_stops_workers(self):
+        self.worker_pid()
+        self.parent.send_signal(signal.SIGTERM)
+        self.parent.wait(5)
+        self.assert_port_closed()
+
+    def test_workers_exit_when_parent_is_killed(self):
+        self.worker_pid()
+        self.parent.kill()
+        self.parent.wait(5)
+        self.assert_port_closed()
+
+    def test_dead_worker_is_replaced(self):
+        pid = self.worker_pid()
+        os.kill(pid, signal.SIGKILL)
+        time.sleep(1.5)
+        pids = {self.worker_pid() for _ in range(20)}
+        self.assertNotIn(pid, pids)
+        self.assertEqual(len(pids), 2)
+        self.parent.terminate()
+        self.parent.wait(5)
+        self.assertIn(b'worker %d exited' % pid, self.parent.stderr.read())
+
+
+if __name__ == '__main__':
+    unittest.main()